@@ -1,3 +1,16 @@
-from .main import app
+from .startup import startup_timings
+
+startup_timings.mark("app_package_imported")
+
+
+def __getattr__(name):
+    # `app.main` imports FastAPI and builds the app; import it only when the ASGI app is requested,
+    # so process-pool workers importing `app.infrastructure.*` don't pay for it.
+    if name == "app":
+        from .main import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["app"]
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.domain.calculator import calculate_values
+
+DEFAULT_CALC_INPUTS = ("500", "700", "30")
+MAX_TRACKED_CLIENTS = 1024
+
+
+class CalculatorService:
+    """
+    Memoized calculator with per-client request coalescing.
+    Results come from the bounded LRU in `calculate_values`. A request is answered right away
+    unless it follows another one from the same client within `debounce_sec`; such burst requests
+    wait out the window and are dropped without computing anything if a newer one arrived meanwhile.
+    """
+
+    def __init__(self, debounce_sec: float = 0.05):
+        self.debounce_sec = debounce_sec
+        self.default_result = calculate_values(*DEFAULT_CALC_INPUTS)
+        self._last_arrival: Dict[str, float] = {}
+        self._latest_seq: Dict[str, int] = {}
+        self._next_seq = 0
+
+    def calculate(self, amount_raw: str, rate_raw: str, period_raw: str) -> Dict[str, str]:
+        return calculate_values(amount_raw, rate_raw, period_raw)
+
+    async def calculate_latest(
+        self,
+        client_id: Optional[str],
+        amount_raw: str,
+        rate_raw: str,
+        period_raw: str,
+    ) -> Optional[Dict[str, str]]:
+        """Return the result, or None when a newer request from the same client superseded this one."""
+        if not client_id or self.debounce_sec <= 0:
+            return self.calculate(amount_raw, rate_raw, period_raw)
+
+        now = time.monotonic()
+        last_arrival = self._last_arrival.get(client_id)
+        self._last_arrival[client_id] = now
+        if len(self._last_arrival) > MAX_TRACKED_CLIENTS:
+            self._forget_idle_clients(now)
+        if last_arrival is None or now - last_arrival >= self.debounce_sec:
+            return self.calculate(amount_raw, rate_raw, period_raw)
+
+        self._next_seq += 1
+        seq = self._next_seq
+        self._latest_seq[client_id] = seq
+        await asyncio.sleep(self.debounce_sec)
+        if self._latest_seq.get(client_id) != seq:
+            return None
+        del self._latest_seq[client_id]
+        return self.calculate(amount_raw, rate_raw, period_raw)
+
+    def _forget_idle_clients(self, now: float):
+        self._last_arrival = {
+            client_id: arrival
+            for client_id, arrival in self._last_arrival.items()
+            if now - arrival < self.debounce_sec or client_id in self._latest_seq
+        }
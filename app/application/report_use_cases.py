@@ -1,22 +1,49 @@
+from collections import OrderedDict
+import logging
+from pathlib import Path
+import threading
 from typing import Dict, Optional
 import time
 
 from app.domain.aliases import parse_aliases
-from app.domain.calculator import calculate_values
-from app.domain.statistics import build_amount_stats
+from app.domain.snapshot_diff import diff_snapshots, status_index
+from app.domain.statistics import StatsBinning, StatsCube, slice_amount_stats
+from app.domain.stats_history import build_history_chart
+from app.infrastructure.item_snapshots import ItemSnapshotStore
 from app.infrastructure.item_sources import ItemSource
+from app.infrastructure.job_executor import JobExecutor, build_stats_cube_job, build_stats_cube_with_history_job
 from app.infrastructure.report_repository import ReportRepository
+from app.infrastructure.stats_history_repository import StatsHistoryRepository
+
+API_BASELINE_LIMIT = 32
+
+logger = logging.getLogger("uvicorn.error")
 
 
 class ReportUseCases:
-    def __init__(self, item_source: ItemSource, report_repository: ReportRepository):
+    def __init__(
+        self,
+        item_source: ItemSource,
+        report_repository: ReportRepository,
+        snapshot_store: ItemSnapshotStore,
+        job_executor: JobExecutor,
+        stats_history: StatsHistoryRepository,
+    ):
         self.item_source = item_source
         self.report_repository = report_repository
-        self._stats_items_cache: Dict[tuple[str, bool], tuple[float, list[dict]]] = {}
+        self.snapshot_store = snapshot_store
+        self.job_executor = job_executor
+        self.stats_history = stats_history
+        self._stats_snapshot_cache: Dict[tuple[str, bool], tuple[float, Path]] = {}
+        self._stats_cube_cache: Dict[tuple[str, bool], StatsCube] = {}
         self._stats_cache_ttl_sec = 300
-
-    def calculate(self, amount_raw: str, rate_raw: str, period_raw: str) -> Dict[str, str]:
-        return calculate_values(amount_raw, rate_raw, period_raw)
+        self._stats_refreshing: set[tuple[str, bool]] = set()
+        self._stats_refresh_lock = threading.Lock()
+        # id -> status indexes per API query: what the last table load showed, and what the last
+        # change check saw. Kept apart so a check never moves the "new since last load" baseline.
+        self._load_baselines: "OrderedDict[tuple, Dict[str, object]]" = OrderedDict()
+        self._check_baselines: "OrderedDict[tuple, Dict[str, object]]" = OrderedDict()
+        self._baselines_lock = threading.Lock()
 
     def build_table_from_file(self, json_path: str, aliases_raw: str) -> Dict[str, object]:
         items = self.item_source.load_from_file(json_path)
@@ -30,9 +57,53 @@ class ReportUseCases:
         ignore_ssl: bool,
         aliases_raw: str,
     ) -> Dict[str, object]:
+        items: list[dict] = []
+
+        def collect_pages(pages):
+            for page_items in pages:
+                items.extend(page_items)
+                yield page_items
+
+        pages = self.item_source.iter_filtered_pages(base_url, api_params, ignore_ssl)
+        report = self.report_repository.run_report_for_pages(collect_pages(pages))
+        snapshot_key = self._api_snapshot_key(base_url, api_params, ignore_ssl)
+        previous = self._load_baselines.get(snapshot_key)
+        new_ids = diff_snapshots(previous, items)["added_ids"] if previous is not None else set()
+        self._remember_baseline(self._load_baselines, snapshot_key, status_index(items))
+        with self._baselines_lock:
+            self._check_baselines.pop(snapshot_key, None)
+        return self._apply_aliases(report, aliases_raw, new_ids)
+
+    def detect_api_changes(
+        self,
+        base_url: str,
+        api_params: Dict[str, str],
+        ignore_ssl: bool,
+    ) -> Optional[Dict[str, object]]:
+        """
+        Fetch a fresh snapshot and diff it against the previous check for the same query,
+        falling back to the last table load. Returns None when there is nothing to compare with.
+        """
         items = self.item_source.fetch_all_filtered(base_url, api_params, ignore_ssl)
-        report = self.report_repository.run_report_for_items(items)
-        return self._apply_aliases(report, aliases_raw)
+        snapshot_key = self._api_snapshot_key(base_url, api_params, ignore_ssl)
+        previous = self._check_baselines.get(snapshot_key)
+        if previous is None:
+            previous = self._load_baselines.get(snapshot_key)
+        self._remember_baseline(self._check_baselines, snapshot_key, status_index(items))
+        if previous is None:
+            return None
+        return diff_snapshots(previous, items)
+
+    @staticmethod
+    def _api_snapshot_key(base_url: str, api_params: Dict[str, str], ignore_ssl: bool) -> tuple:
+        return (base_url, tuple(sorted(api_params.items())), ignore_ssl)
+
+    def _remember_baseline(self, baselines: OrderedDict, snapshot_key: tuple, index: Dict[str, object]):
+        with self._baselines_lock:
+            baselines[snapshot_key] = index
+            baselines.move_to_end(snapshot_key)
+            while len(baselines) > API_BASELINE_LIMIT:
+                baselines.popitem(last=False)
 
     def build_amount_distribution(
         self,
@@ -41,35 +112,114 @@ class ReportUseCases:
         min_amount_count: Optional[int],
         max_amount_count: Optional[int],
         min_rating: Optional[float],
+        status: Optional[str] = None,
+        binning: Optional[StatsBinning] = None,
     ) -> Dict[str, object]:
-        items = self._get_cached_stats_items(base_url, ignore_ssl)
-        return build_amount_stats(
-            items,
+        cube = self._get_cached_stats_cube(base_url, ignore_ssl, binning or StatsBinning())
+        stats = slice_amount_stats(
+            cube,
             min_amount_count=min_amount_count,
             max_amount_count=max_amount_count,
             min_rating=min_rating,
+            status=status,
         )
+        stats["statuses"] = cube.statuses
+        return stats
+
+    def preload_stats_snapshot(self, base_url: str, ignore_ssl: bool, binning: StatsBinning) -> bool:
+        """
+        Seed the statistics caches from a snapshot persisted by a previous run.
+        The snapshot keeps its file age, so once past the TTL it is served stale while a
+        background refresh fetches a fresh one.
+        """
+        cache_key = (base_url, ignore_ssl)
+        snapshot_path = self.snapshot_store.path_for(cache_key)
+        if not snapshot_path.exists() or cache_key in self._stats_snapshot_cache:
+            return False
+        fetched_at = snapshot_path.stat().st_mtime
+        cube = self.job_executor.run(build_stats_cube_job, str(snapshot_path), binning)
+        self._stats_cube_cache.setdefault(cache_key, cube)
+        self._stats_snapshot_cache.setdefault(cache_key, (fetched_at, snapshot_path))
+        return True
+
+    def build_distribution_history(self, window_hours: float) -> Dict[str, object]:
+        points = self.stats_history.load(time.time() - window_hours * 3600)
+        return build_history_chart(points)
 
-    def _get_cached_stats_items(self, base_url: str, ignore_ssl: bool) -> list[dict]:
+    def _get_cached_stats_cube(self, base_url: str, ignore_ssl: bool, binning: StatsBinning) -> StatsCube:
+        """
+        The cube is built once per snapshot (and binning) in a worker process;
+        filter changes are then answered by slicing it, without rescanning items.
+        Stale-while-revalidate: a snapshot past the TTL is still served while a background
+        refresh replaces it; only a missing snapshot is fetched in the request.
+        """
         cache_key = (base_url, ignore_ssl)
-        now = time.time()
-        cached = self._stats_items_cache.get(cache_key)
-        if cached:
-            ts, items = cached
-            if now - ts <= self._stats_cache_ttl_sec:
-                return items
+        cached = self._stats_snapshot_cache.get(cache_key)
+        if cached is None or not cached[1].exists():
+            return self._refresh_stats(base_url, ignore_ssl, binning)
 
+        fetched_at, snapshot_path = cached
+        if time.time() - fetched_at > self._stats_cache_ttl_sec:
+            self._refresh_stats_in_background(base_url, ignore_ssl, binning)
+
+        cube = self._stats_cube_cache.get(cache_key)
+        if cube is not None and cube.binning == binning:
+            return cube
+        cube = self.job_executor.run(build_stats_cube_job, str(snapshot_path), binning)
+        self._stats_cube_cache[cache_key] = cube
+        return cube
+
+    def _refresh_stats(self, base_url: str, ignore_ssl: bool, binning: StatsBinning) -> StatsCube:
+        cache_key = (base_url, ignore_ssl)
+        fetched_at = time.time()
         items = self.item_source.fetch_all_unfiltered(base_url, ignore_ssl)
-        self._stats_items_cache[cache_key] = (now, items)
-        return items
+        snapshot_path = self.snapshot_store.write(cache_key, items)
+        # History keeps the unfiltered distribution of every fresh snapshot on its own fixed grid.
+        cube, (total_records, buckets) = self.job_executor.run(
+            build_stats_cube_with_history_job, str(snapshot_path), binning
+        )
+        self.stats_history.record(total_records, buckets)
+        self._stats_cube_cache[cache_key] = cube
+        self._stats_snapshot_cache[cache_key] = (fetched_at, snapshot_path)
+        return cube
+
+    def _refresh_stats_in_background(self, base_url: str, ignore_ssl: bool, binning: StatsBinning):
+        cache_key = (base_url, ignore_ssl)
+        with self._stats_refresh_lock:
+            if cache_key in self._stats_refreshing:
+                return
+            self._stats_refreshing.add(cache_key)
+
+        def run():
+            try:
+                self._refresh_stats(base_url, ignore_ssl, binning)
+            except Exception as exc:
+                # The stale snapshot keeps being served; the next request past the TTL retries.
+                logger.warning("Background stats refresh failed: %s", exc)
+            finally:
+                with self._stats_refresh_lock:
+                    self._stats_refreshing.discard(cache_key)
+
+        threading.Thread(target=run, name="stats-refresh", daemon=True).start()
 
     @staticmethod
-    def _apply_aliases(report: Dict[str, object], aliases_raw: str) -> Dict[str, object]:
+    def _apply_aliases(
+        report: Dict[str, object],
+        aliases_raw: str,
+        new_ids: Optional[set] = None,
+    ) -> Dict[str, object]:
         aliases = parse_aliases(aliases_raw)
         columns = report["columns"]
+        rows = report["rows"]
+        new_flags = [False] * len(rows)
+        if new_ids and "id" in columns:
+            id_idx = columns.index("id")
+            new_flags = [row[id_idx] is not None and str(row[id_idx]) in new_ids for row in rows]
         return {
             "columns": columns,
             "headers": [aliases.get(col, col) for col in columns],
-            "rows": report["rows"],
+            "rows": rows,
             "rows_count": report["rows_count"],
+            "new_flags": new_flags,
+            "new_count": sum(new_flags),
         }
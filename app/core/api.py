@@ -1,8 +1,22 @@
+from dataclasses import dataclass
+import gzip
+import hashlib
 import json
+import os
+from pathlib import Path
 import ssl
+import threading
+from typing import Dict, Optional
+from urllib.error import HTTPError
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from urllib.request import Request, urlopen
 
+from .files import write_atomic
+
+DEFAULT_TIMEOUT_SEC = 20.0
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+HTTP_CACHE_EVICT_EVERY = 32
+
 
 def build_query_url(base_url: str, params: dict) -> str:
     parsed = urlparse(base_url)
@@ -14,11 +28,128 @@ def build_query_url(base_url: str, params: dict) -> str:
     return urlunparse(parsed._replace(query=query))
 
 
-def fetch_json(url: str, verify_ssl: bool = True):
-    req = Request(url, headers={"User-Agent": "Tkinter-Report/1.0"})
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    payload: bytes
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def body(self) -> bytes:
+        return gzip.decompress(self.payload)
+
+
+class HttpCache:
+    """
+    Disk cache of response bodies keyed by URL.
+    Each entry is one file: a JSON line with the ETag/Last-Modified validators followed by the
+    gzipped body, replaced atomically so a validator is never paired with another response's body.
+    Total size is kept under max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stores_since_evict = 0
+
+    def load(self, url: str) -> Optional[CachedResponse]:
+        try:
+            raw = self._path(url).read_bytes()
+        except OSError:
+            return None
+        header, separator, payload = raw.partition(b"\n")
+        if not separator:
+            return None
+        try:
+            meta = json.loads(header.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if not isinstance(meta, dict) or meta.get("url") != url:
+            return None
+        return CachedResponse(etag=meta.get("etag"), last_modified=meta.get("last_modified"), payload=payload)
+
+    def touch(self, url: str):
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        if not etag and not last_modified:
+            return
+        header = json.dumps({"url": url, "etag": etag, "last_modified": last_modified}).encode("utf-8")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(self._path(url), header + b"\n" + gzip.compress(body, compresslevel=1))
+        except OSError:
+            # Cache is best-effort: a failed write only costs a full download next time.
+            return
+        with self._lock:
+            self._stores_since_evict += 1
+            if self._stores_since_evict < HTTP_CACHE_EVICT_EVERY:
+                return
+            self._stores_since_evict = 0
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.cache"
+
+
+def fetch_json(
+    url: str,
+    verify_ssl: bool = True,
+    timeout: float = DEFAULT_TIMEOUT_SEC,
+    cache: Optional[HttpCache] = None,
+):
+    headers = {"User-Agent": "Tkinter-Report/1.0", "Accept-Encoding": "gzip"}
+    cached = cache.load(url) if cache is not None else None
+    if cached is not None:
+        headers.update(cached.validators())
+    req = Request(url, headers=headers)
     context = None
     if not verify_ssl:
         context = ssl._create_unverified_context()
-    with urlopen(req, timeout=20, context=context) as resp:
-        data = resp.read()
+    try:
+        with urlopen(req, timeout=timeout, context=context) as resp:
+            data = resp.read()
+            content_encoding = (resp.headers.get("Content-Encoding") or "").lower()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+    except HTTPError as exc:
+        if exc.code == 304 and cached is not None:
+            cache.touch(url)
+            return json.loads(cached.body().decode("utf-8"))
+        raise
+
+    if content_encoding == "gzip":
+        data = gzip.decompress(data)
+    if cache is not None:
+        cache.store(url, data, etag, last_modified)
     return json.loads(data.decode("utf-8"))
@@ -1,11 +1,20 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[2]
+# Writable state (settings, caches, snapshots, history); overridable for isolated runs such as load tests.
+DATA_DIR = Path(os.getenv("KAPUSTA_DATA_DIR", str(BASE_DIR)))
 
 DATA_JSON_DEFAULT = BASE_DIR / "700.json"
 SQL_FILE_DEFAULT = BASE_DIR / "myRequest.sql"
 API_BASE_DEFAULT = "https://kapusta.by/api/internal/v1/public/loans/lend_request/"
-CONFIG_PATH = BASE_DIR / "kapusta_report_settings.json"
+CONFIG_PATH = DATA_DIR / "kapusta_report_settings.json"
+FETCH_TUNING_PATH = DATA_DIR / "kapusta_fetch_tuning.json"
+HTTP_CACHE_DIR = DATA_DIR / ".http_cache"
+SNAPSHOT_DIR = DATA_DIR / ".snapshots"
+STATS_HISTORY_PATH = DATA_DIR / "kapusta_stats_history.sqlite3"
+PROCESS_POOL_WORKERS_DEFAULT = 1
+PROCESS_POOL_MAX_PENDING_DEFAULT = 4
 DEFAULT_STATUS = "active"
 
 APP_TITLE = "Kapusta Report"
@@ -69,8 +69,12 @@ def extract_last_statement(sql_text: str) -> str:
     return statements[-1]
 
 
-def prepare_db(items):
-    conn = sqlite3.connect(":memory:")
+def create_db(path: str = ":memory:"):
+    conn = sqlite3.connect(path)
+    if path != ":memory:":
+        # Scratch snapshot file: durability is not needed, only a fast bulk load.
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
     conn.execute(
         """
         CREATE TABLE requests (
@@ -88,6 +92,10 @@ def prepare_db(items):
         )
         """
     )
+    return conn
+
+
+def insert_items(conn: sqlite3.Connection, items):
     rows = []
     for item in items:
         if not isinstance(item, dict):
@@ -118,6 +126,11 @@ def prepare_db(items):
         """,
         rows,
     )
+
+
+def prepare_db(items):
+    conn = create_db()
+    insert_items(conn, items)
     return conn
 
 
@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+import threading
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Write-then-rename, so readers never see a half-written file.
+    The temp name is unique per process and thread, so concurrent writers don't share it.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
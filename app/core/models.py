@@ -34,6 +34,22 @@ class ApiParams:
         return {field: getattr(self, field) for field in self.__annotations__}
 
 
+@dataclass
+class StatsParams:
+    period_buckets: str = "10,20,30,40,60"
+    amount_bin_width: str = ""
+    max_amount_bins: str = "40"
+    rating_band_width: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]):
+        values = {field: data.get(field, getattr(cls(), field)) for field in cls.__annotations__}
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {field: getattr(self, field) for field in self.__annotations__}
+
+
 @dataclass
 class AppConfig:
     json_path: str
@@ -41,16 +57,19 @@ class AppConfig:
     aliases: str
     ignore_ssl: bool
     api_params: ApiParams
+    stats_params: StatsParams
 
     @classmethod
     def from_dict(cls, data: Dict[str, str], defaults: "AppConfig"):
         api_params = ApiParams.from_dict(data.get("api_params", {}))
+        stats_params = StatsParams.from_dict(data.get("stats_params", {}))
         return cls(
             json_path=data.get("json_path", defaults.json_path),
             api_base_url=data.get("api_base_url", defaults.api_base_url),
             aliases=data.get("aliases", defaults.aliases),
             ignore_ssl=_to_bool(data.get("ignore_ssl", defaults.ignore_ssl), defaults.ignore_ssl),
             api_params=api_params,
+            stats_params=stats_params,
         )
 
     def to_dict(self) -> Dict[str, str]:
@@ -60,4 +79,5 @@ class AppConfig:
             "aliases": self.aliases,
             "ignore_ssl": self.ignore_ssl,
             "api_params": self.api_params.to_dict(),
+            "stats_params": self.stats_params.to_dict(),
         }
@@ -1,5 +1,6 @@
 import json
 from .constants import CONFIG_PATH
+from .files import write_atomic
 from .models import AppConfig, ApiParams
 
 
@@ -13,7 +14,7 @@ def load_config():
 
 
 def save_config(data: dict):
-    CONFIG_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_atomic(CONFIG_PATH, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
 
 
 def load_app_config(defaults: AppConfig) -> AppConfig:
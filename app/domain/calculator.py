@@ -1,4 +1,7 @@
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+CALC_CACHE_SIZE = 4096
 
 
 def _parse_float(value: str) -> Optional[float]:
@@ -8,12 +11,22 @@ def _parse_float(value: str) -> Optional[float]:
         return None
 
 
+def normalize_inputs(amount_raw: str, rate_raw: str, period_raw: str) -> Tuple[str, str, str]:
+    return tuple((value or "").strip().replace(",", ".") for value in (amount_raw, rate_raw, period_raw))
+
+
 def calculate_values(amount_raw: str, rate_raw: str, period_raw: str) -> Dict[str, str]:
+    # Copy, so callers can't mutate the cached result.
+    return dict(_calculate_normalized(*normalize_inputs(amount_raw, rate_raw, period_raw)))
+
+
+@lru_cache(maxsize=CALC_CACHE_SIZE)
+def _calculate_normalized(amount_raw: str, rate_raw: str, period_raw: str) -> Dict[str, str]:
     amount = _parse_float(amount_raw)
     rate = _parse_float(rate_raw)
     period = _parse_float(period_raw)
 
-    if amount is None or rate is None or period is None or period == 0:
+    if amount is None or rate is None or period is None or period == 0 or amount == 0:
         return {
             "income_with_commission": "-",
             "income_without_commission": "-",
@@ -0,0 +1,65 @@
+from typing import Dict, Iterable, List, Optional
+
+
+def _item_key(item: dict) -> Optional[str]:
+    value = item.get("id")
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def index_by_id(items: Iterable[dict]) -> Dict[str, dict]:
+    indexed: Dict[str, dict] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        key = _item_key(item)
+        if key is not None:
+            indexed[key] = item
+    return indexed
+
+
+def status_index(items: Iterable[dict]) -> Dict[str, object]:
+    """Compact id -> status view of a snapshot; enough to diff against later without keeping the items."""
+    return {key: item.get("status") for key, item in index_by_id(items).items()}
+
+
+def diff_snapshots(previous: Dict[str, object], current: Iterable[dict]) -> Dict[str, object]:
+    """
+    Keyed diff of a stored id -> status index against a fresh snapshot.
+    The current items are indexed into a dict once, so the comparison is O(n + m).
+    """
+    current_by_id = index_by_id(current)
+
+    added: List[dict] = []
+    status_changed: List[Dict[str, object]] = []
+    for key, item in current_by_id.items():
+        if key not in previous:
+            added.append(item)
+            continue
+        old_status = previous[key]
+        new_status = item.get("status")
+        if old_status != new_status:
+            status_changed.append(
+                {
+                    "id": key,
+                    "old_status": old_status,
+                    "new_status": new_status,
+                    "item": item,
+                }
+            )
+
+    removed = [
+        {"id": key, "status": old_status}
+        for key, old_status in previous.items()
+        if key not in current_by_id
+    ]
+
+    return {
+        "added": added,
+        "removed": removed,
+        "status_changed": status_changed,
+        "added_ids": {_item_key(item) for item in added},
+    }
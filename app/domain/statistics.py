@@ -1,8 +1,78 @@
 from collections import Counter, defaultdict
-from typing import Dict, List, Optional, Union
+from dataclasses import dataclass, field
+import math
+from typing import Dict, List, Optional, Tuple, Union
 
 PERIOD_BUCKETS = [10, 20, 30, 40, 60]
 OTHER_BUCKET = "other"
+DEFAULT_MAX_AMOUNT_BINS = 40
+MAX_AMOUNT_BINS_LIMIT = 200
+
+PeriodBucket = Union[int, str]
+CubeKey = Tuple[float, PeriodBucket, Optional[float], Optional[str]]
+
+
+@dataclass(frozen=True)
+class StatsBinning:
+    """
+    Binning of the statistics cube.
+    - amount_bin_width: fixed amount range per bin, widened to a round width when the data would
+      need more than max_amount_bins bins; None keeps exact amounts while there are at most
+      max_amount_bins of them and picks a round bin width otherwise
+    - max_amount_bins: clamped to MAX_AMOUNT_BINS_LIMIT
+    - rating_band_width: rating band size, bands are (k*width, (k+1)*width]; None keeps exact ratings
+    """
+
+    period_buckets: Tuple[int, ...] = tuple(PERIOD_BUCKETS)
+    amount_bin_width: Optional[float] = None
+    max_amount_bins: int = DEFAULT_MAX_AMOUNT_BINS
+    rating_band_width: Optional[float] = None
+
+    @classmethod
+    def from_params(cls, params: Dict[str, str]):
+        raw_buckets = (params.get("period_buckets") or "").strip()
+        period_buckets = tuple(PERIOD_BUCKETS)
+        if raw_buckets:
+            period_buckets = tuple(sorted({int(part) for part in raw_buckets.split(",") if part.strip()}))
+
+        amount_bin_width = _parse_positive(params.get("amount_bin_width"), "amount_bin_width")
+        rating_band_width = _parse_positive(params.get("rating_band_width"), "rating_band_width")
+
+        raw_max_bins = (params.get("max_amount_bins") or "").strip()
+        max_amount_bins = int(raw_max_bins) if raw_max_bins else DEFAULT_MAX_AMOUNT_BINS
+        if max_amount_bins < 1:
+            raise ValueError("max_amount_bins must be positive")
+        max_amount_bins = min(max_amount_bins, MAX_AMOUNT_BINS_LIMIT)
+
+        return cls(
+            period_buckets=period_buckets,
+            amount_bin_width=amount_bin_width,
+            max_amount_bins=max_amount_bins,
+            rating_band_width=rating_band_width,
+        )
+
+
+@dataclass
+class StatsCube:
+    """Pre-aggregated counts per (amount bin, period bucket, rating band, status)."""
+
+    binning: StatsBinning
+    amount_bin_width: Optional[float]
+    cells: Dict[CubeKey, int] = field(default_factory=dict)
+
+    @property
+    def statuses(self) -> List[str]:
+        return sorted({status for _, _, _, status in self.cells if status is not None})
+
+
+def _parse_positive(value: Optional[str], name: str) -> Optional[float]:
+    raw = (value or "").strip().replace(",", ".")
+    if not raw:
+        return None
+    parsed = float(raw)
+    if parsed <= 0:
+        raise ValueError(f"{name} must be positive")
+    return parsed
 
 
 def _parse_amount(item: dict) -> Optional[float]:
@@ -35,12 +105,79 @@ def _parse_rating(item: dict) -> Optional[float]:
         return None
 
 
-def _bucket_period_days(period_days: int) -> Union[int, str]:
-    if period_days in PERIOD_BUCKETS:
+def _bucket_period_days(period_days: int, period_buckets: Tuple[int, ...]) -> PeriodBucket:
+    if period_days in period_buckets:
         return period_days
     return OTHER_BUCKET
 
 
+def _band(value: float, width: Optional[float]) -> float:
+    if width is None:
+        return value
+    return math.floor(value / width) * width
+
+
+def _rating_band(value: float, width: Optional[float]) -> float:
+    """Lower edge of the (lo, lo + width] band, so `rating > k * width` filters whole bands."""
+    if width is None:
+        return value
+    return math.ceil(value / width) * width - width
+
+
+def _bin_count(low: float, high: float, width: float) -> int:
+    return math.floor(high / width) - math.floor(low / width) + 1
+
+
+def _nice_bin_width(low: float, high: float, max_bins: int) -> float:
+    """Smallest 1/2/2.5/5 x 10^k width that covers [low, high] in at most max_bins aligned bins."""
+    raw_width = (high - low) / max_bins if high > low else 1.0
+    magnitude = 10 ** math.floor(math.log10(raw_width))
+    while True:
+        for step in (1, 2, 2.5, 5):
+            width = step * magnitude
+            if _bin_count(low, high, width) <= max_bins:
+                return width
+        magnitude *= 10
+
+
+def _resolve_amount_bin_width(amounts: List[float], binning: StatsBinning) -> Optional[float]:
+    distinct = set(amounts)
+    if binning.amount_bin_width is not None:
+        width = binning.amount_bin_width
+        if not distinct or _bin_count(min(distinct), max(distinct), width) <= binning.max_amount_bins:
+            return width
+    elif len(distinct) <= binning.max_amount_bins:
+        return None
+    return _nice_bin_width(min(distinct), max(distinct), binning.max_amount_bins)
+
+
+def build_stats_cube(items: List[dict], binning: Optional[StatsBinning] = None) -> StatsCube:
+    binning = binning or StatsBinning()
+    parsed = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        amount = _parse_amount(item)
+        period_days = _parse_period_days(item)
+        if amount is None or period_days is None:
+            continue
+        rating = _parse_rating(item)
+        parsed.append((amount, period_days, rating, item.get("status")))
+
+    amount_bin_width = _resolve_amount_bin_width([amount for amount, _, _, _ in parsed], binning)
+    cells: Counter = Counter()
+    for amount, period_days, rating, status in parsed:
+        key = (
+            _band(amount, amount_bin_width),
+            _bucket_period_days(period_days, binning.period_buckets),
+            None if rating is None else _rating_band(rating, binning.rating_band_width),
+            status,
+        )
+        cells[key] += 1
+
+    return StatsCube(binning=binning, amount_bin_width=amount_bin_width, cells=dict(cells))
+
+
 def _filter_amounts(
     sorted_amounts: List[float],
     amount_totals: Counter,
@@ -55,40 +192,51 @@ def _filter_amounts(
     return filtered
 
 
-def build_amount_stats(
-    items: List[dict],
+def _amount_label(amount: float, bin_width: Optional[float]) -> str:
+    if bin_width is None:
+        return f"{amount:.2f}"
+    return f"{amount:.2f}–{amount + bin_width:.2f}"
+
+
+def slice_amount_stats(
+    cube: StatsCube,
     min_amount_count: Optional[int] = None,
     max_amount_count: Optional[int] = None,
     min_rating: Optional[float] = None,
+    status: Optional[str] = None,
 ) -> Dict[str, object]:
+    """
+    Roll the cube up to amount x period counts for the chart.
+    min_rating keeps ratings strictly greater than it; with rating bands it must be a multiple of
+    the band width, so that every band lies entirely on one side of it.
+    """
+    band_width = cube.binning.rating_band_width
+    if min_rating is not None and band_width is not None:
+        bands = min_rating / band_width
+        if abs(bands - round(bands)) > 1e-9:
+            raise ValueError(f"min_rating must be a multiple of rating_band_width ({band_width:g})")
+
     amount_totals: Counter = Counter()
     amount_period_counts = defaultdict(Counter)
 
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-
-        amount = _parse_amount(item)
-        period_days = _parse_period_days(item)
-        rating = _parse_rating(item)
-        if amount is None or period_days is None:
-            continue
+    for (amount, bucket, rating, item_status), count in cube.cells.items():
         if min_rating is not None:
-            if rating is None or rating <= min_rating:
+            # A band keyed by lo holds ratings in (lo, lo + width]: all of them exceed min_rating iff lo >= min_rating.
+            if rating is None or (rating < min_rating if band_width is not None else rating <= min_rating):
                 continue
-
-        bucket = _bucket_period_days(period_days)
-        amount_totals[amount] += 1
-        amount_period_counts[bucket][amount] += 1
+        if status and item_status != status:
+            continue
+        amount_totals[amount] += count
+        amount_period_counts[bucket][amount] += count
 
     sorted_amounts = sorted(amount_totals.keys())
     sorted_amounts = _filter_amounts(sorted_amounts, amount_totals, min_amount_count, max_amount_count)
 
-    period_keys: List[Union[int, str]] = [key for key in PERIOD_BUCKETS if key in amount_period_counts]
+    period_keys: List[PeriodBucket] = [key for key in cube.binning.period_buckets if key in amount_period_counts]
     if OTHER_BUCKET in amount_period_counts:
         period_keys.append(OTHER_BUCKET)
 
-    labels = [f"{amount:.2f}" for amount in sorted_amounts]
+    labels = [_amount_label(amount, cube.amount_bin_width) for amount in sorted_amounts]
     datasets = []
 
     for period_key in period_keys:
@@ -105,3 +253,47 @@ def build_amount_stats(
         "datasets": datasets,
         "total_records": sum(amount_totals[amount] for amount in sorted_amounts),
     }
+
+
+def fixed_amount_distribution(
+    items: List[dict],
+    bin_width: float,
+    max_bins: int,
+) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    """
+    (total records, {period bucket: {amount bin label: count}}) on a grid that doesn't depend on
+    the data or on the user's binning: bins [k*w, (k+1)*w) for k < max_bins and one open-ended
+    bin above, so distributions of different snapshots share their keys.
+    """
+    overflow_from = bin_width * max_bins
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    total = 0
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        amount = _parse_amount(item)
+        period_days = _parse_period_days(item)
+        if amount is None or period_days is None:
+            continue
+        if amount >= overflow_from:
+            label = f"≥{overflow_from:.2f}"
+        else:
+            label = _amount_label(_band(max(amount, 0.0), bin_width), bin_width)
+        counts[str(_bucket_period_days(period_days, tuple(PERIOD_BUCKETS)))][label] += 1
+        total += 1
+    return total, {period_key: dict(bins) for period_key, bins in counts.items()}
+
+
+def build_amount_stats(
+    items: List[dict],
+    min_amount_count: Optional[int] = None,
+    max_amount_count: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    binning: Optional[StatsBinning] = None,
+) -> Dict[str, object]:
+    return slice_amount_stats(
+        build_stats_cube(items, binning),
+        min_amount_count=min_amount_count,
+        max_amount_count=max_amount_count,
+        min_rating=min_rating,
+    )
@@ -0,0 +1,62 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from app.domain.statistics import fixed_amount_distribution
+
+HistoryPoint = Tuple[float, float, Dict[str, Dict[str, float]]]
+
+# History uses its own fixed amount grid: the chart's binning follows user settings and, in auto
+# mode, each snapshot's amount range, so its labels can't be compared across time.
+HISTORY_AMOUNT_BIN_WIDTH = 500.0
+HISTORY_AMOUNT_BINS = 40
+
+
+def history_distribution(items: List[dict]) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    """Total records and {period_bucket: {amount bin: count}} of one snapshot, on the history grid."""
+    return fixed_amount_distribution(items, HISTORY_AMOUNT_BIN_WIDTH, HISTORY_AMOUNT_BINS)
+
+
+def merge_points(points: List[HistoryPoint]) -> Tuple[float, Dict[str, Dict[str, float]]]:
+    """Average several snapshots into one downsampled point (total records, bucket counts)."""
+    if not points:
+        return 0.0, {}
+    size = len(points)
+    merged: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    total = 0.0
+    for _, total_records, buckets in points:
+        total += total_records
+        for period_key, counts in buckets.items():
+            for amount, count in counts.items():
+                merged[period_key][amount] += count
+    return (
+        round(total / size, 2),
+        {
+            period_key: {amount: round(count / size, 2) for amount, count in counts.items()}
+            for period_key, counts in merged.items()
+        },
+    )
+
+
+def build_history_chart(points: List[HistoryPoint]) -> Dict[str, object]:
+    """Trend payload: total records and per-period-bucket counts for each stored point."""
+    period_keys = sorted(
+        {period_key for _, _, buckets in points for period_key in buckets},
+        key=lambda key: (not key.isdigit(), int(key) if key.isdigit() else 0, key),
+    )
+    labels = [datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M") for ts, _, _ in points]
+    # Raw, hourly and daily points are unevenly spaced; the chart plots them on a time axis.
+    timestamps = [int(ts * 1000) for ts, _, _ in points]
+    datasets = [
+        {
+            "label": period_key,
+            "data": [round(sum(buckets.get(period_key, {}).values()), 2) for _, _, buckets in points],
+        }
+        for period_key in period_keys
+    ]
+    return {
+        "labels": labels,
+        "timestamps": timestamps,
+        "datasets": datasets,
+        "totals": [total_records for _, total_records, _ in points],
+    }
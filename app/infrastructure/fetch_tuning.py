@@ -0,0 +1,130 @@
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+import threading
+from typing import Dict, List, Optional
+
+from app.core.api import DEFAULT_TIMEOUT_SEC
+from app.core.files import write_atomic
+
+PAGE_SIZE_CANDIDATES = (1000, 500, 250, 100)
+MIN_WORKERS = 1
+MAX_WORKERS = 16
+# Tuning may only lengthen the request timeout: a page that times out is retried once and then skipped.
+MIN_TIMEOUT_SEC = DEFAULT_TIMEOUT_SEC
+MAX_TIMEOUT_SEC = 60.0
+MAX_STORED_TUNINGS = 64
+
+
+@dataclass
+class FetchTuning:
+    page_size: int = 100
+    max_workers: int = 4
+    timeout_sec: float = DEFAULT_TIMEOUT_SEC
+    probed: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]):
+        defaults = cls()
+        try:
+            return cls(
+                page_size=max(1, int(data.get("page_size", defaults.page_size))),
+                max_workers=min(MAX_WORKERS, max(MIN_WORKERS, int(data.get("max_workers", defaults.max_workers)))),
+                timeout_sec=min(MAX_TIMEOUT_SEC, max(MIN_TIMEOUT_SEC, float(data.get("timeout_sec", defaults.timeout_sec)))),
+                probed=bool(data.get("probed", defaults.probed)),
+            )
+        except (TypeError, ValueError):
+            return defaults
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class FetchTuningStore:
+    """
+    Persists tuned fetch parameters per query URL between runs.
+    A query without its own entry starts from the entry of its base URL.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, key: str, fallback_key: Optional[str] = None) -> FetchTuning:
+        with self._lock:
+            data = self._load()
+        raw = data.get(key)
+        if not isinstance(raw, dict) and fallback_key is not None:
+            raw = data.get(fallback_key)
+        if not isinstance(raw, dict):
+            return FetchTuning()
+        return FetchTuning.from_dict(raw)
+
+    def save(self, key: str, tuning: FetchTuning):
+        with self._lock:
+            data = self._load()
+            data.pop(key, None)
+            data[key] = tuning.to_dict()
+            # Most recently saved entries are last; drop the oldest filter combinations.
+            while len(data) > MAX_STORED_TUNINGS:
+                data.pop(next(iter(data)))
+            try:
+                write_atomic(self.path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+            except OSError:
+                # Tuning is an optimization only; losing it must not break fetching.
+                pass
+
+    def _load(self) -> Dict[str, object]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+class ConcurrencyController:
+    """
+    AIMD limit on requests in flight, adjusted as each request completes:
+    - additive increase: every clean completion close to baseline latency adds 1/workers,
+      so the limit grows by about one worker per window of completions
+    - multiplicative decrease (halving) on an error or a latency spike, at most once per
+      window, so completions of one congested window don't halve it repeatedly
+    """
+
+    def __init__(self, initial_workers: int, baseline_latency_sec: float):
+        self.workers = min(MAX_WORKERS, max(MIN_WORKERS, initial_workers))
+        self.baseline_latency_sec = max(baseline_latency_sec, 0.001)
+        self.latencies: List[float] = [baseline_latency_sec]
+        self._increase_credit = 0.0
+        self._completions_since_decrease = 0
+        self._decrease_window = 0
+
+    def record_latency(self, latency: float):
+        """Latency sample for the timeout only; requests that ran one at a time say nothing about concurrency."""
+        self.latencies.append(latency)
+
+    def record(self, latency: Optional[float], error: bool = False):
+        """One completed request; latency is None for a failed one."""
+        self._completions_since_decrease += 1
+        if latency is not None:
+            self.latencies.append(latency)
+        if error or latency is None or latency > self.baseline_latency_sec * 2.0:
+            # Requests already in flight at the last decrease belong to the same window.
+            if self._completions_since_decrease > self._decrease_window:
+                self._decrease_window = self.workers
+                self.workers = max(MIN_WORKERS, self.workers // 2)
+                self._completions_since_decrease = 0
+                self._increase_credit = 0.0
+            return
+        if latency <= self.baseline_latency_sec * 1.5:
+            self._increase_credit += 1.0 / self.workers
+            if self._increase_credit >= 1.0:
+                self._increase_credit = 0.0
+                self.workers = min(MAX_WORKERS, self.workers + 1)
+
+    def suggested_timeout(self) -> float:
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(MAX_TIMEOUT_SEC, max(MIN_TIMEOUT_SEC, p95 * 5.0))
@@ -0,0 +1,30 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import List
+
+from app.core.files import write_atomic
+
+
+class ItemSnapshotStore:
+    """
+    Stores fetched item lists as compact JSON files.
+    Worker processes read items from these files instead of receiving pickled dict lists.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def path_for(self, key: tuple) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"items-{digest}.json"
+
+    def write(self, key: tuple, items: List[dict]) -> Path:
+        path = self.path_for(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        return path
+
+
+def read_items_snapshot(path: str) -> List[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
@@ -1,16 +1,40 @@
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import chain
 import math
+import queue
+import threading
+import time
 from urllib.error import HTTPError
 from urllib.parse import unquote, urlparse, urlunparse
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional
 
-from app.core.api import build_query_url, fetch_json
-from app.core.constants import DEFAULT_STATUS
+from app.core.api import HttpCache, build_query_url, fetch_json
+from app.core.constants import DEFAULT_STATUS, FETCH_TUNING_PATH, HTTP_CACHE_DIR
 from app.core.data import extract_items, load_items
+from app.infrastructure.fetch_tuning import (
+    MAX_WORKERS,
+    PAGE_SIZE_CANDIDATES,
+    ConcurrencyController,
+    FetchTuning,
+    FetchTuningStore,
+)
+
+
+MAX_TOTAL_ITEMS = 100_000
+PIPELINE_QUEUE_PAGES = 8
 
 
 class ItemSource:
+    def __init__(
+        self,
+        tuning_store: Optional[FetchTuningStore] = None,
+        http_cache: Optional[HttpCache] = None,
+    ):
+        self.tuning_store = tuning_store or FetchTuningStore(FETCH_TUNING_PATH)
+        self.http_cache = http_cache or HttpCache(HTTP_CACHE_DIR)
+
     def load_from_file(self, json_path: str) -> List[dict]:
         path = Path(json_path)
         if not path.exists():
@@ -18,65 +42,208 @@ class ItemSource:
         return load_items(path)
 
     def fetch_all_filtered(self, base_url: str, api_params: Dict[str, str], ignore_ssl: bool) -> List[dict]:
+        return list(chain.from_iterable(self.iter_filtered_pages(base_url, api_params, ignore_ssl)))
+
+    def fetch_all_unfiltered(self, base_url: str, ignore_ssl: bool) -> List[dict]:
+        return list(chain.from_iterable(self.iter_unfiltered_pages(base_url, ignore_ssl)))
+
+    def iter_filtered_pages(self, base_url: str, api_params: Dict[str, str], ignore_ssl: bool) -> Iterator[List[dict]]:
         params = dict(api_params)
         params.setdefault("status", DEFAULT_STATUS)
-        return self._fetch_paginated(base_url, params, ignore_ssl)
+        return self._iter_pages(base_url, params, ignore_ssl)
 
-    def fetch_all_unfiltered(self, base_url: str, ignore_ssl: bool) -> List[dict]:
-        return self._fetch_paginated(base_url, {}, ignore_ssl)
+    def iter_unfiltered_pages(self, base_url: str, ignore_ssl: bool) -> Iterator[List[dict]]:
+        return self._iter_pages(base_url, {}, ignore_ssl)
 
-    def _fetch_paginated(self, base_url: str, base_params: Dict[str, str], ignore_ssl: bool) -> List[dict]:
+    def _iter_pages(self, base_url: str, base_params: Dict[str, str], ignore_ssl: bool) -> Iterator[List[dict]]:
         """
-        Load paginated data from API.
+        Load paginated data from API, yielding each page's items as soon as it arrives.
         Strategy:
-        - page 1 request first
+        - page 1 request first, probing the largest page size the API accepts on the first run
         - if total pages can be inferred from pagination meta, fetch remaining pages concurrently
+          through a sliding window of AIMD-tuned size
         - otherwise fallback to sequential scan until empty page
+        Pages after the first are downloaded by a background producer into a bounded queue,
+        so the caller can process one page while others are still downloading.
+        Pages are yielded in arrival order, not page order.
+        Page size, concurrency and timeout are stored per query for the next run; a capped page
+        size is only learned once the API has shown more data after a short page.
         """
-        all_items: List[dict] = []
-        page_size = 100
-
         normalized_base_url = self._normalize_base_url(base_url)
-        params = dict(base_params)
-        params["page"] = "1"
-        params["page_size"] = str(page_size)
-        first_raw = self._fetch_json_with_retry(normalized_base_url, params, ignore_ssl)
+        # Filters change how many items a page holds, so tuning is learned per query.
+        tuning_key = build_query_url(normalized_base_url, base_params)
+        tuning = self.tuning_store.get(tuning_key, fallback_key=normalized_base_url)
+        first_raw, first_latency, page_size = self._fetch_first_page(normalized_base_url, base_params, ignore_ssl, tuning)
         first_items = extract_items(first_raw)
         if not first_items:
-            return []
+            return
+
+        yield first_items
 
-        all_items.extend(first_items)
         total_pages = self._extract_total_pages(first_raw, page_size)
+        total_count = self._extract_total_count(first_raw)
+        tuning.page_size = page_size
+        tuning.probed = True
+        meta_has_more = bool(total_pages and total_pages > 1) or bool(total_count and total_count > len(first_items))
+        if meta_has_more and len(first_items) < page_size:
+            # Pagination meta promises more data after a short page: the API silently capped page_size.
+            page_size = len(first_items)
+            total_pages = self._extract_total_pages(first_raw, page_size)
+            tuning.page_size = page_size
+        controller = ConcurrencyController(tuning.max_workers, first_latency)
 
         if total_pages and total_pages > 1:
-            all_items.extend(self._fetch_pages_parallel(normalized_base_url, base_params, ignore_ssl, page_size, total_pages))
-            return all_items
+            yield from self._pipeline(
+                lambda emit: self._fetch_pages_parallel(
+                    normalized_base_url,
+                    base_params,
+                    ignore_ssl,
+                    page_size,
+                    total_pages,
+                    controller,
+                    tuning.timeout_sec,
+                    emit,
+                )
+            )
+        elif total_pages is None:
+            yield from self._pipeline(
+                lambda emit: self._fetch_pages_sequential(
+                    normalized_base_url,
+                    base_params,
+                    ignore_ssl,
+                    page_size,
+                    len(first_items),
+                    controller,
+                    tuning.timeout_sec,
+                    emit,
+                    lambda served_size: setattr(tuning, "page_size", served_size),
+                )
+            )
+
+        self._save_tuning(tuning_key, tuning, controller)
+
+    @staticmethod
+    def _pipeline(produce: Callable[[Callable[[List[dict]], bool]], None]) -> Iterator[List[dict]]:
+        """
+        Run `produce` in a background thread and yield the pages it emits.
+        The queue is bounded, so a slow consumer throttles the producer (backpressure);
+        `emit` returns False once the consumer has stopped, telling the producer to quit.
+        """
+        page_queue: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_PAGES)
+        stopped = threading.Event()
 
+        def put(entry: tuple) -> bool:
+            while not stopped.is_set():
+                try:
+                    page_queue.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def run():
+            try:
+                produce(lambda items: put(("items", items)))
+            except Exception as exc:
+                put(("error", exc))
+            finally:
+                put(("done", None))
+
+        producer = threading.Thread(target=run, name="item-source-producer", daemon=True)
+        producer.start()
+        try:
+            while True:
+                kind, payload = page_queue.get()
+                if kind == "done":
+                    break
+                if kind == "error":
+                    raise payload
+                yield payload
+        finally:
+            stopped.set()
+
+    def _fetch_pages_sequential(
+        self,
+        base_url: str,
+        base_params: Dict[str, str],
+        ignore_ssl: bool,
+        page_size: int,
+        first_page_len: int,
+        controller: ConcurrencyController,
+        timeout: float,
+        emit: Callable[[List[dict]], bool],
+        on_capped: Callable[[int], None],
+    ):
+        """
+        Scan pages until an empty one.
+        Without pagination meta a short page is either the last one or a silently capped one:
+        until a cap is confirmed, the scan looks one page further. Data after a short page
+        confirms the cap, which is reported through `on_capped` and ends the scan at the next short page.
+        """
+        served_size = page_size
+        capped = False
+        previous_len = first_page_len
         page = 2
         while True:
             params = dict(base_params)
             params["page"] = str(page)
             params["page_size"] = str(page_size)
+            started = time.perf_counter()
             try:
-                raw = self._fetch_json_with_retry(normalized_base_url, params, ignore_ssl)
+                raw = self._fetch_json_with_retry(base_url, params, ignore_ssl, timeout)
             except Exception:
                 # Keep already downloaded pages instead of failing whole request.
                 break
+            controller.record_latency(time.perf_counter() - started)
             items = extract_items(raw)
 
             if not items:
                 break
 
-            all_items.extend(items)
+            if not capped and previous_len < served_size:
+                served_size = previous_len
+                capped = True
+                on_capped(served_size)
+
+            if not emit(items):
+                break
 
-            if len(items) < page_size:
+            if capped and len(items) < served_size:
                 break
 
+            previous_len = len(items)
             page += 1
-            if page > 1000:
+            if page > max(1, MAX_TOTAL_ITEMS // served_size):
                 break
 
-        return all_items
+    def _fetch_first_page(
+        self,
+        base_url: str,
+        base_params: Dict[str, str],
+        ignore_ssl: bool,
+        tuning: FetchTuning,
+    ) -> tuple[object, float, int]:
+        candidates = [tuning.page_size]
+        if not tuning.probed:
+            candidates = [size for size in PAGE_SIZE_CANDIDATES if size >= tuning.page_size] or candidates
+
+        last_error: Exception | None = None
+        for page_size in candidates:
+            params = dict(base_params)
+            params["page"] = "1"
+            params["page_size"] = str(page_size)
+            started = time.perf_counter()
+            try:
+                raw = self._fetch_json_with_retry(base_url, params, ignore_ssl, tuning.timeout_sec)
+            except HTTPError as exc:
+                # Oversized page_size may be rejected; retry with the next smaller candidate.
+                if not 400 <= exc.code < 500:
+                    raise
+                last_error = exc
+                continue
+            return raw, time.perf_counter() - started, page_size
+
+        raise last_error
 
     def _fetch_pages_parallel(
         self,
@@ -85,34 +252,52 @@ class ItemSource:
         ignore_ssl: bool,
         page_size: int,
         total_pages: int,
-    ) -> List[dict]:
-        max_workers = min(8, max(1, total_pages - 1))
+        controller: ConcurrencyController,
+        timeout: float,
+        emit: Callable[[List[dict]], bool],
+    ):
         pages = list(range(2, total_pages + 1))
-        page_results: Dict[int, List[dict]] = {}
 
-        def fetch_page(page: int) -> List[dict]:
+        def fetch_page(page: int) -> tuple[List[dict], float]:
             params = dict(base_params)
             params["page"] = str(page)
             params["page_size"] = str(page_size)
-            try:
-                raw = self._fetch_json_with_retry(base_url, params, ignore_ssl)
-                return extract_items(raw)
-            except Exception:
-                # Degrade gracefully: skip failed page and keep other pages.
-                return []
+            started = time.perf_counter()
+            raw = self._fetch_json_with_retry(base_url, params, ignore_ssl, timeout)
+            return extract_items(raw), time.perf_counter() - started
 
-        with ThreadPoolExecutor(max_workers=max_workers) as pool:
-            futures = {pool.submit(fetch_page, page): page for page in pages}
-            for future, page in futures.items():
-                try:
-                    page_results[page] = future.result()
-                except Exception:
-                    page_results[page] = []
+        # Sliding window: the next page goes out as soon as any page completes, with at most
+        # controller.workers in flight, so one slow page doesn't idle the other workers.
+        pending = deque(pages)
+        retried: set[int] = set()
+        in_flight: Dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pages))) as pool:
+            while pending or in_flight:
+                while pending and len(in_flight) < controller.workers:
+                    page = pending.popleft()
+                    in_flight[pool.submit(fetch_page, page)] = page
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = in_flight.pop(future)
+                    try:
+                        items, latency = future.result()
+                    except Exception:
+                        controller.record(None, error=True)
+                        # Retry a failed page once, then degrade gracefully and skip it.
+                        if page not in retried:
+                            retried.add(page)
+                            pending.append(page)
+                        continue
+                    controller.record(latency)
+                    if items and not emit(items):
+                        for other in in_flight:
+                            other.cancel()
+                        return
 
-        ordered_items: List[dict] = []
-        for page in pages:
-            ordered_items.extend(page_results.get(page, []))
-        return ordered_items
+    def _save_tuning(self, tuning_key: str, tuning: FetchTuning, controller: ConcurrencyController):
+        tuning.max_workers = controller.workers
+        tuning.timeout_sec = controller.suggested_timeout()
+        self.tuning_store.save(tuning_key, tuning)
 
     @staticmethod
     def _extract_total_pages(raw: object, page_size: int) -> int | None:
@@ -127,17 +312,25 @@ class ItemSource:
             if isinstance(value, int) and value > 0:
                 return value
 
-        total_count = None
-        for key in ("count", "total", "total_count", "items_count"):
-            value = pagination.get(key)
-            if isinstance(value, int) and value >= 0:
-                total_count = value
-                break
-
+        total_count = ItemSource._extract_total_count(raw)
         if total_count is None:
             return None
         return max(1, math.ceil(total_count / page_size))
 
+    @staticmethod
+    def _extract_total_count(raw: object) -> int | None:
+        if not isinstance(raw, dict):
+            return None
+        pagination = raw.get("pagination")
+        if not isinstance(pagination, dict):
+            return None
+
+        for key in ("count", "total", "total_count", "items_count"):
+            value = pagination.get(key)
+            if isinstance(value, int) and value >= 0:
+                return value
+        return None
+
     @staticmethod
     def _normalize_base_url(base_url: str) -> str:
         parsed = urlparse((base_url or "").strip())
@@ -162,10 +355,10 @@ class ItemSource:
 
         return urlunparse(parsed._replace(path=decoded_path, query=query, fragment=""))
 
-    def _fetch_json_with_retry(self, base_url: str, params: Dict[str, str], ignore_ssl: bool):
+    def _fetch_json_with_retry(self, base_url: str, params: Dict[str, str], ignore_ssl: bool, timeout: float):
         request_url = build_query_url(base_url, params)
         try:
-            return fetch_json(request_url, verify_ssl=not ignore_ssl)
+            return fetch_json(request_url, verify_ssl=not ignore_ssl, timeout=timeout, cache=self.http_cache)
         except HTTPError as exc:
             if exc.code != 404:
                 raise
@@ -0,0 +1,110 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.constants import PROCESS_POOL_MAX_PENDING_DEFAULT, PROCESS_POOL_WORKERS_DEFAULT
+from app.core.data import load_default_sql, run_report
+from app.domain.statistics import StatsBinning, StatsCube, build_stats_cube
+from app.domain.stats_history import history_distribution
+from app.infrastructure.item_snapshots import read_items_snapshot
+
+
+class JobExecutor:
+    """
+    Runs CPU-heavy report/statistics jobs in a process pool, so they don't hold the GIL
+    of the web workers serving interactive endpoints.
+    - max_workers <= 0 runs jobs inline in the calling thread
+    - at most max_pending jobs are submitted at once; further callers wait for a slot
+    - workers are started by a fork server (spawn where unavailable), never forked from the
+      threaded web process
+    - a pool broken by a dead worker is replaced and the job retried once
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Pool size from KAPUSTA_PROCESS_WORKERS / KAPUSTA_PROCESS_MAX_PENDING; invalid values keep the defaults."""
+        return cls(
+            max_workers=_env_int("KAPUSTA_PROCESS_WORKERS", PROCESS_POOL_WORKERS_DEFAULT),
+            max_pending=_env_int("KAPUSTA_PROCESS_MAX_PENDING", PROCESS_POOL_MAX_PENDING_DEFAULT),
+        )
+
+    def run(self, fn: Callable, *args):
+        if self.max_workers <= 0:
+            return fn(*args)
+        with self._slots:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    return pool.submit(fn, *args).result()
+                except BrokenProcessPool:
+                    self._discard_pool(pool)
+                    if attempt:
+                        raise
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_pool_context())
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def run_report_job(db_path: str) -> Dict[str, object]:
+    conn = sqlite3.connect(db_path)
+    try:
+        columns, rows = run_report(conn, load_default_sql())
+    finally:
+        conn.close()
+    return {
+        "columns": columns,
+        "rows": rows,
+        "rows_count": len(rows),
+    }
+
+
+def build_stats_cube_job(snapshot_path: str, binning: StatsBinning) -> StatsCube:
+    items = read_items_snapshot(snapshot_path)
+    return build_stats_cube(items, binning)
+
+
+def build_stats_cube_with_history_job(
+    snapshot_path: str,
+    binning: StatsBinning,
+) -> Tuple[StatsCube, Tuple[int, Dict[str, Dict[str, int]]]]:
+    """Cube for the chart plus the fixed-grid history point of a fresh snapshot, from one read."""
+    items = read_items_snapshot(snapshot_path)
+    return build_stats_cube(items, binning), history_distribution(items)
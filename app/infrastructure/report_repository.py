@@ -1,16 +1,33 @@
-from typing import Dict, List
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional
 
-from app.core.data import load_default_sql, prepare_db, run_report
+from app.core.data import create_db, insert_items
+from app.infrastructure.job_executor import JobExecutor, run_report_job
 
 
 class ReportRepository:
+    def __init__(self, job_executor: Optional[JobExecutor] = None):
+        self.job_executor = job_executor or JobExecutor(max_workers=0, max_pending=1)
+
     def run_report_for_items(self, items: List[dict]) -> Dict[str, object]:
-        conn = prepare_db(items)
-        sql_text = load_default_sql()
-        columns, rows = run_report(conn, sql_text)
-        conn.close()
-        return {
-            "columns": columns,
-            "rows": rows,
-            "rows_count": len(rows),
-        }
+        return self.run_report_for_pages([items])
+
+    def run_report_for_pages(self, pages: Iterable[List[dict]]) -> Dict[str, object]:
+        """
+        Insert each page as soon as it is produced, so loading overlaps with fetching.
+        Items go into a scratch SQLite file that the report job opens in a worker process.
+        """
+        fd, db_path = tempfile.mkstemp(prefix="kapusta-report-", suffix=".sqlite3")
+        os.close(fd)
+        try:
+            conn = create_db(db_path)
+            try:
+                for items in pages:
+                    insert_items(conn, items)
+                conn.commit()
+            finally:
+                conn.close()
+            return self.job_executor.run(run_report_job, db_path)
+        finally:
+            os.unlink(db_path)
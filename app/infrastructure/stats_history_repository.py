@@ -0,0 +1,121 @@
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from app.domain.stats_history import HistoryPoint, merge_points
+
+HOUR_SEC = 3600
+DAY_SEC = 24 * HOUR_SEC
+
+RESOLUTION_RAW = "raw"
+RESOLUTION_HOURLY = "hourly"
+RESOLUTION_DAILY = "daily"
+
+
+class StatsHistoryRepository:
+    """
+    Time series of amount distribution aggregates.
+    Retention and downsampling:
+    - raw points are kept for `raw_retention_sec`, then averaged into hourly points
+    - hourly points are kept for `hourly_retention_sec`, then averaged into daily points
+    - daily points older than `daily_retention_sec` are dropped
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        raw_retention_sec: int = 2 * DAY_SEC,
+        hourly_retention_sec: int = 30 * DAY_SEC,
+        daily_retention_sec: int = 365 * DAY_SEC,
+    ):
+        self.path = path
+        self.raw_retention_sec = raw_retention_sec
+        self.hourly_retention_sec = hourly_retention_sec
+        self.daily_retention_sec = daily_retention_sec
+        self._lock = threading.Lock()
+
+    def record(self, total_records: float, buckets: Dict[str, Dict[str, float]], ts: Optional[float] = None):
+        now = time.time() if ts is None else ts
+        with self._session() as conn:
+            conn.execute(
+                "INSERT INTO distribution_history (ts, resolution, total_records, buckets) VALUES (?, ?, ?, ?)",
+                (now, RESOLUTION_RAW, total_records, json.dumps(buckets, separators=(",", ":"))),
+            )
+            self._compact(conn, now)
+
+    def load(self, since_ts: float) -> List[HistoryPoint]:
+        with self._session() as conn:
+            rows = conn.execute(
+                "SELECT ts, total_records, buckets FROM distribution_history WHERE ts >= ? ORDER BY ts",
+                (since_ts,),
+            ).fetchall()
+        return [(ts, total_records, json.loads(buckets)) for ts, total_records, buckets in rows]
+
+    def _compact(self, conn: sqlite3.Connection, now: float):
+        self._downsample(conn, RESOLUTION_RAW, RESOLUTION_HOURLY, HOUR_SEC, now - self.raw_retention_sec)
+        self._downsample(conn, RESOLUTION_HOURLY, RESOLUTION_DAILY, DAY_SEC, now - self.hourly_retention_sec)
+        conn.execute(
+            "DELETE FROM distribution_history WHERE resolution = ? AND ts < ?",
+            (RESOLUTION_DAILY, now - self.daily_retention_sec),
+        )
+
+    @staticmethod
+    def _downsample(
+        conn: sqlite3.Connection,
+        source: str,
+        target: str,
+        period_sec: int,
+        older_than: float,
+    ):
+        # Only whole slots are downsampled, so every slot ends up as exactly one point.
+        older_than = (older_than // period_sec) * period_sec
+        rows = conn.execute(
+            "SELECT ts, total_records, buckets FROM distribution_history WHERE resolution = ? AND ts < ?",
+            (source, older_than),
+        ).fetchall()
+        if not rows:
+            return
+
+        grouped: Dict[int, List[HistoryPoint]] = {}
+        for ts, total_records, buckets in rows:
+            grouped.setdefault(int(ts // period_sec), []).append((ts, total_records, json.loads(buckets)))
+
+        for slot, points in grouped.items():
+            total_records, buckets = merge_points(points)
+            conn.execute(
+                "INSERT INTO distribution_history (ts, resolution, total_records, buckets) VALUES (?, ?, ?, ?)",
+                (slot * period_sec, target, total_records, json.dumps(buckets, separators=(",", ":"))),
+            )
+        conn.execute(
+            "DELETE FROM distribution_history WHERE resolution = ? AND ts < ?",
+            (source, older_than),
+        )
+
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS distribution_history (
+                ts REAL,
+                resolution TEXT,
+                total_records REAL,
+                buckets TEXT
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS distribution_history_ts ON distribution_history (resolution, ts)")
+        return conn
@@ -1,37 +1,122 @@
+from contextlib import asynccontextmanager
+import logging
 from pathlib import Path
+import threading
+from typing import TYPE_CHECKING, Optional
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from app.application.report_use_cases import ReportUseCases
+from app.application.calculator_service import CalculatorService
 from app.core.constants import API_BASE_DEFAULT, DATA_JSON_DEFAULT
-from app.core.models import ApiParams, AppConfig
+from app.core.models import ApiParams, AppConfig, StatsParams
 from app.core.settings import load_app_config, save_app_config
-from app.infrastructure.item_sources import ItemSource
-from app.infrastructure.report_repository import ReportRepository
+from app.domain.statistics import StatsBinning
+from app.rendering import chunked, render_table_rows, report_etag
+from app.startup import startup_timings
+
+if TYPE_CHECKING:
+    from app.application.report_use_cases import ReportUseCases
 
 BASE_DIR = Path(__file__).resolve().parent
+WARM_UP_TEMPLATES = (
+    "index.html",
+    "partials/calc_result.html",
+    "partials/table_container.html",
+    "partials/stats_chart.html",
+)
+
+CALC_CLIENT_HEADER = "x-calc-client"
+
+logger = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    startup_timings.mark("lifespan_started")
+    # Heavy initialization runs in the background, so the server starts accepting requests right away.
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    yield
+    if _use_cases is not None:
+        _use_cases.job_executor.shutdown()
+
 
-app = FastAPI(title="Kapusta Web Report")
+app = FastAPI(title="Kapusta Web Report", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
 
+def _empty_report() -> dict:
+    return {"columns": [], "headers": [], "rows": [], "rows_count": 0, "new_flags": [], "new_count": 0}
+
+
 class AppState:
     def __init__(self):
-        self.report = {"columns": [], "headers": [], "rows": [], "rows_count": 0}
+        self.report = _empty_report()
         self.stats = {"labels": [], "values": [], "total_records": 0}
         self.status = "Выберите источник данных и загрузите таблицу."
+        self._etag_source: tuple = (None, None)
+        self._etag = ""
 
-
-state = AppState()
-use_cases = ReportUseCases(item_source=ItemSource(), report_repository=ReportRepository())
+    def report_etag(self) -> str:
+        # Reports are replaced, never mutated, so identity + status identifies the fragment.
+        if self._etag_source[0] is not self.report or self._etag_source[1] != self.status:
+            self._etag = report_etag(self.report, self.status)
+            self._etag_source = (self.report, self.status)
+        return self._etag
 
 
-def _empty_report() -> dict:
-    return {"columns": [], "headers": [], "rows": [], "rows_count": 0}
+state = AppState()
+calculator_service = CalculatorService()
+_use_cases: Optional["ReportUseCases"] = None
+_use_cases_lock = threading.Lock()
+
+
+def get_use_cases() -> "ReportUseCases":
+    """Build use cases and their infrastructure on first use instead of at import time."""
+    global _use_cases
+    if _use_cases is None:
+        with _use_cases_lock:
+            if _use_cases is None:
+                from app.application.report_use_cases import ReportUseCases
+                from app.core.constants import SNAPSHOT_DIR, STATS_HISTORY_PATH
+                from app.infrastructure.item_snapshots import ItemSnapshotStore
+                from app.infrastructure.item_sources import ItemSource
+                from app.infrastructure.job_executor import JobExecutor
+                from app.infrastructure.report_repository import ReportRepository
+                from app.infrastructure.stats_history_repository import StatsHistoryRepository
+
+                job_executor = JobExecutor.from_env()
+                _use_cases = ReportUseCases(
+                    item_source=ItemSource(),
+                    report_repository=ReportRepository(job_executor),
+                    snapshot_store=ItemSnapshotStore(SNAPSHOT_DIR),
+                    job_executor=job_executor,
+                    stats_history=StatsHistoryRepository(STATS_HISTORY_PATH),
+                )
+                startup_timings.mark("use_cases_ready")
+    return _use_cases
+
+
+def _warm_up():
+    for template_name in WARM_UP_TEMPLATES:
+        templates.get_template(template_name)
+    startup_timings.mark("templates_compiled")
+
+    use_cases = get_use_cases()
+    cfg = load_app_config(_default_config())
+    try:
+        binning = StatsBinning.from_params(cfg.stats_params.to_dict())
+        if use_cases.preload_stats_snapshot(cfg.api_base_url, cfg.ignore_ssl, binning):
+            startup_timings.mark("stats_snapshot_preloaded")
+    except Exception as exc:
+        logger.warning("Stats snapshot preload failed: %s", exc)
+    startup_timings.mark("warm_up_done")
+    logger.info("Startup timings (s since process start): %s", startup_timings.as_dict())
 
 
 def _default_config() -> AppConfig:
@@ -41,36 +126,88 @@ def _default_config() -> AppConfig:
         aliases="",
         ignore_ssl=False,
         api_params=ApiParams(),
+        stats_params=StatsParams(),
     )
 
 
 def _view_context(request: Request):
     cfg = load_app_config(_default_config())
-    calculator = use_cases.calculate("500", "700", "30")
+    calculator = calculator_service.default_result
     return {
         "request": request,
         "config": cfg,
         "api_params": cfg.api_params.to_dict(),
+        "stats_params": cfg.stats_params.to_dict(),
         "calculator": calculator,
         "report": state.report,
+        "report_rows": render_table_rows(state.report),
+        "report_etag": state.report_etag(),
         "stats": state.stats,
         "status": state.status,
     }
 
 
+def _table_container_response(request: Request) -> Response:
+    """
+    Stream `partials/table_container.html` in chunks instead of rendering it into one string.
+    The ETag lets clients revalidate an unchanged report fragment with a 304; the page embeds it
+    and revalidates via GET /partials/table when the tab becomes visible again.
+    """
+    etag = state.report_etag()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    template = templates.get_template("partials/table_container.html")
+    body = template.generate(
+        {
+            "request": request,
+            "report": state.report,
+            "report_rows": render_table_rows(state.report),
+            "report_etag": etag,
+            "status": state.status,
+        }
+    )
+    return StreamingResponse(chunked(body), media_type="text/html; charset=utf-8", headers=headers)
+
+
+def _config_with_api_form(api_base_url: str, api_form: dict) -> AppConfig:
+    cfg = load_app_config(_default_config())
+    cfg.api_base_url = api_base_url or cfg.api_base_url
+    cfg.api_params = ApiParams.from_dict(api_form)
+    return cfg
+
+
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request):
-    return templates.TemplateResponse("index.html", _view_context(request))
+    response = templates.TemplateResponse("index.html", _view_context(request))
+    if startup_timings.mark("first_index_served"):
+        logger.info("First / served %.3fs after process start", startup_timings.as_dict()["first_index_served"])
+    return response
+
+
+@app.get("/startup-timings")
+def startup_timings_view():
+    return JSONResponse(startup_timings.as_dict())
 
 
 @app.post("/actions/calc", response_class=HTMLResponse)
-def calc_partial(
+async def calc_partial(
     request: Request,
     calc_amount: str = Form(""),
     calc_rate: str = Form(""),
     calc_period: str = Form(""),
 ):
-    result = use_cases.calculate(calc_amount, calc_rate, calc_period)
+    # Async and memoized: keystroke traffic is served on the event loop without a worker thread.
+    result = await calculator_service.calculate_latest(
+        request.headers.get(CALC_CLIENT_HEADER),
+        calc_amount,
+        calc_rate,
+        calc_period,
+    )
+    if result is None:
+        # Superseded by a newer keystroke; htmx leaves the target untouched on 204.
+        return Response(status_code=204)
     return templates.TemplateResponse(
         "partials/calc_result.html",
         {
@@ -80,6 +217,29 @@ def calc_partial(
     )
 
 
+@app.get("/api/calc")
+async def calc_json(
+    request: Request,
+    amount: str = "",
+    rate: str = "",
+    period: str = "",
+):
+    result = await calculator_service.calculate_latest(
+        request.headers.get(CALC_CLIENT_HEADER),
+        amount,
+        rate,
+        period,
+    )
+    if result is None:
+        return Response(status_code=204)
+    return JSONResponse(result)
+
+
+@app.get("/partials/table", response_class=HTMLResponse)
+def table_partial(request: Request):
+    return _table_container_response(request)
+
+
 @app.post("/actions/load-file", response_class=HTMLResponse)
 def load_file(
     request: Request,
@@ -90,20 +250,13 @@ def load_file(
     save_app_config(cfg)
 
     try:
-        state.report = use_cases.build_table_from_file(cfg.json_path, cfg.aliases)
+        state.report = get_use_cases().build_table_from_file(cfg.json_path, cfg.aliases)
         state.status = f"Строк: {state.report['rows_count']}"
     except Exception as exc:
         state.report = _empty_report()
         state.status = f"Ошибка: {exc}"
 
-    return templates.TemplateResponse(
-        "partials/table_container.html",
-        {
-            "request": request,
-            "report": state.report,
-            "status": state.status,
-        },
-    )
+    return _table_container_response(request)
 
 
 @app.post("/actions/load-api", response_class=HTMLResponse)
@@ -117,9 +270,8 @@ def load_api(
     rating_min: str = Form(""),
     rating_max: str = Form(""),
 ):
-    cfg = load_app_config(_default_config())
-    cfg.api_base_url = api_base_url or cfg.api_base_url
-    cfg.api_params = ApiParams.from_dict(
+    cfg = _config_with_api_form(
+        api_base_url,
         {
             "amount_min": amount_min,
             "amount_max": amount_max,
@@ -127,12 +279,12 @@ def load_api(
             "period_days_max": period_days_max,
             "rating_min": rating_min,
             "rating_max": rating_max,
-        }
+        },
     )
     save_app_config(cfg)
 
     try:
-        state.report = use_cases.build_table_from_api(
+        state.report = get_use_cases().build_table_from_api(
             base_url=cfg.api_base_url,
             api_params=cfg.api_params.to_dict(),
             ignore_ssl=cfg.ignore_ssl,
@@ -140,6 +292,7 @@ def load_api(
         )
         state.status = (
             f"Строк: {state.report['rows_count']} | "
+            f"Новых: {state.report['new_count']} | "
             f"amount_min={cfg.api_params.amount_min}, "
             f"amount_max={cfg.api_params.amount_max}, "
             f"period_days_min={cfg.api_params.period_days_min}, "
@@ -151,12 +304,49 @@ def load_api(
         state.report = _empty_report()
         state.status = f"Ошибка: {exc}"
 
+    return _table_container_response(request)
+
+
+@app.post("/actions/diff", response_class=HTMLResponse)
+def load_diff(
+    request: Request,
+    api_base_url: str = Form(""),
+    amount_min: str = Form(""),
+    amount_max: str = Form(""),
+    period_days_min: str = Form(""),
+    period_days_max: str = Form(""),
+    rating_min: str = Form(""),
+    rating_max: str = Form(""),
+):
+    cfg = _config_with_api_form(
+        api_base_url,
+        {
+            "amount_min": amount_min,
+            "amount_max": amount_max,
+            "period_days_min": period_days_min,
+            "period_days_max": period_days_max,
+            "rating_min": rating_min,
+            "rating_max": rating_max,
+        },
+    )
+
+    diff = None
+    error = None
+    try:
+        diff = get_use_cases().detect_api_changes(
+            base_url=cfg.api_base_url,
+            api_params=cfg.api_params.to_dict(),
+            ignore_ssl=cfg.ignore_ssl,
+        )
+    except Exception as exc:
+        error = f"Ошибка: {exc}"
+
     return templates.TemplateResponse(
-        "partials/table_container.html",
+        "partials/diff_summary.html",
         {
             "request": request,
-            "report": state.report,
-            "status": state.status,
+            "diff": diff,
+            "error": error,
         },
     )
 
@@ -188,9 +378,25 @@ def load_stats(
     min_amount_count: str = Form(""),
     max_amount_count: str = Form(""),
     min_rating: str = Form(""),
+    status: str = Form(""),
+    period_buckets: str = Form(""),
+    amount_bin_width: str = Form(""),
+    max_amount_bins: str = Form(""),
+    rating_band_width: str = Form(""),
 ):
     cfg = load_app_config(_default_config())
+    cfg.stats_params = StatsParams.from_dict(
+        {
+            "period_buckets": period_buckets,
+            "amount_bin_width": amount_bin_width,
+            "max_amount_bins": max_amount_bins,
+            "rating_band_width": rating_band_width,
+        }
+    )
     try:
+        binning = StatsBinning.from_params(cfg.stats_params.to_dict())
+        # Only binning that parsed is persisted, so a typo never breaks the next startup.
+        save_app_config(cfg)
         min_count = None
         max_count = None
         min_rating_value = None
@@ -207,12 +413,14 @@ def load_stats(
                 max_count = 0
         if raw_rating:
             min_rating_value = float(raw_rating)
-        state.stats = use_cases.build_amount_distribution(
+        state.stats = get_use_cases().build_amount_distribution(
             base_url=cfg.api_base_url,
             ignore_ssl=cfg.ignore_ssl,
             min_amount_count=min_count,
             max_amount_count=max_count,
             min_rating=min_rating_value,
+            status=(status or "").strip() or None,
+            binning=binning,
         )
         state.status = f"Статистика построена. Записей: {state.stats['total_records']}"
     except Exception as exc:
@@ -226,3 +434,26 @@ def load_stats(
             "status": state.status,
         },
     )
+
+
+@app.post("/actions/stats-history", response_class=HTMLResponse)
+def load_stats_history(
+    request: Request,
+    window_hours: str = Form("168"),
+):
+    try:
+        window = float((window_hours or "").strip() or "168")
+        history = get_use_cases().build_distribution_history(max(window, 1.0))
+        error = None
+    except Exception as exc:
+        history = {"labels": [], "datasets": [], "totals": []}
+        error = f"Ошибка истории: {exc}"
+
+    return templates.TemplateResponse(
+        "partials/stats_history_chart.html",
+        {
+            "request": request,
+            "history": history,
+            "error": error,
+        },
+    )
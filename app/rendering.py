@@ -0,0 +1,43 @@
+import hashlib
+from typing import Iterable, Iterator
+
+from markupsafe import Markup, escape
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def render_table_rows(report: dict) -> Iterator[Markup]:
+    """
+    Fast path for report rows: builds `<tr>` markup directly instead of running
+    the per-cell template loop. Output matches `partials/table.html` cells.
+    """
+    new_flags = report.get("new_flags") or []
+    for index, row in enumerate(report["rows"]):
+        cells = "".join(f"<td>{escape('' if cell is None else cell)}</td>" for cell in row)
+        if index < len(new_flags) and new_flags[index]:
+            yield Markup(f'<tr class="row-new">{cells}</tr>\n')
+        else:
+            yield Markup(f"<tr>{cells}</tr>\n")
+
+
+def chunked(parts: Iterable[str], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """Join small template fragments into chunks of at least `chunk_size` characters."""
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def report_etag(report: dict, status: str) -> str:
+    digest = hashlib.sha1()
+    digest.update(repr((report["headers"], report.get("new_flags"), status)).encode("utf-8"))
+    for row in report["rows"]:
+        digest.update(repr(row).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+from typing import Dict
+
+
+def _process_start_time() -> float:
+    """Wall-clock start of this process; falls back to now where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat", encoding="utf-8") as stat_file:
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", encoding="utf-8") as uptime_file:
+            uptime_sec = float(uptime_file.read().split()[0])
+        started_after_boot_sec = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.time() - (uptime_sec - started_after_boot_sec)
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+class StartupTimings:
+    """Seconds from process start to named startup milestones (first occurrence only)."""
+
+    def __init__(self):
+        self.process_started_at = _process_start_time()
+        self._marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> bool:
+        with self._lock:
+            if name in self._marks:
+                return False
+            self._marks[name] = round(time.time() - self.process_started_at, 4)
+            return True
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._marks.items(), key=lambda item: item[1]))
+
+
+startup_timings = StartupTimings()
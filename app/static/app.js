@@ -12,13 +12,29 @@ function initDataTable() {
     table.DataTable().destroy();
   }
 
-  table.DataTable({
+  const dataTable = table.DataTable({
     pageLength: 25,
     order: [],
     language: {
       url: 'https://cdn.datatables.net/plug-ins/1.13.8/i18n/ru.json'
     }
   });
+
+  $('#only-new-toggle').on('change', function () {
+    dataTable.draw();
+  });
+}
+
+function onlyNewRowsFilter(settings, data, dataIndex) {
+  if (settings.nTable.id !== 'report-table' || !$('#only-new-toggle').is(':checked')) {
+    return true;
+  }
+  const row = settings.aoData[dataIndex];
+  return !!(row && row.nTr && row.nTr.classList.contains('row-new'));
+}
+
+if (window.jQuery && $.fn.dataTable) {
+  $.fn.dataTable.ext.search.push(onlyNewRowsFilter);
 }
 
 let amountChart = null;
@@ -172,6 +188,169 @@ function initAmountChartFromPayload() {
   }
 }
 
+let historyChart = null;
+
+function renderHistoryChart(payload) {
+  const canvas = document.getElementById('history-chart');
+  if (!canvas || !window.Chart) {
+    return;
+  }
+
+  if (historyChart) {
+    historyChart.destroy();
+  }
+
+  // Points are placed by timestamp: raw, hourly and daily points are not evenly spaced.
+  const timestamps = payload.timestamps || [];
+  const toPoints = (values) => values.map((value, index) => ({x: timestamps[index], y: value}));
+  const dateFormatter = new Intl.DateTimeFormat('ru-RU', {dateStyle: 'short', timeStyle: 'short'});
+
+  const datasets = (payload.datasets || []).map((ds, index) => ({
+    label: `period_days: ${ds.label}`,
+    data: toPoints(ds.data),
+    borderColor: colorByIndex(index),
+    backgroundColor: colorByIndex(index),
+    tension: 0.2,
+    pointRadius: 2
+  }));
+  datasets.push({
+    label: 'Всего записей',
+    data: toPoints(payload.totals || []),
+    borderColor: '#334155',
+    backgroundColor: '#334155',
+    borderDash: [6, 4],
+    tension: 0.2,
+    pointRadius: 2
+  });
+
+  historyChart = new Chart(canvas.getContext('2d'), {
+    type: 'line',
+    data: {
+      datasets: datasets
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      scales: {
+        x: {
+          type: 'linear',
+          ticks: {
+            maxTicksLimit: 8,
+            callback: (value) => dateFormatter.format(new Date(value))
+          }
+        },
+        y: {
+          beginAtZero: true,
+          title: {
+            display: true,
+            text: 'count'
+          }
+        }
+      },
+      plugins: {
+        legend: {
+          display: true,
+          position: 'bottom'
+        },
+        tooltip: {
+          callbacks: {
+            title: (items) => (items.length ? dateFormatter.format(new Date(items[0].parsed.x)) : '')
+          }
+        }
+      }
+    }
+  });
+}
+
+function initHistoryChartFromPayload() {
+  const payloadEl = document.getElementById('history-chart-payload');
+  if (!payloadEl) {
+    return;
+  }
+  try {
+    renderHistoryChart(JSON.parse(payloadEl.textContent || '{}'));
+  } catch (err) {
+    console.error('Failed to parse history chart payload:', err);
+  }
+}
+
+function initCalculator() {
+  const form = document.getElementById('calc-form');
+  if (!form || !window.fetch) {
+    return;
+  }
+
+  let controller = null;
+  // Per page instance, not per cookie: two tabs of one browser must not supersede each other.
+  const clientId = window.crypto && crypto.randomUUID
+    ? crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
+  const update = async function () {
+    if (controller) {
+      controller.abort();
+    }
+    controller = new AbortController();
+    const data = new FormData(form);
+    const params = new URLSearchParams({
+      amount: data.get('calc_amount') || '',
+      rate: data.get('calc_rate') || '',
+      period: data.get('calc_period') || ''
+    });
+    try {
+      const resp = await fetch(`${form.dataset.calcUrl}?${params}`, {
+        signal: controller.signal,
+        headers: {'X-Calc-Client': clientId}
+      });
+      if (resp.status !== 200) {
+        return;
+      }
+      const result = await resp.json();
+      form.querySelectorAll('[data-calc-field]').forEach((el) => {
+        el.textContent = result[el.dataset.calcField] ?? '-';
+      });
+    } catch (err) {
+      if (err.name !== 'AbortError') {
+        console.error('Calculator request failed:', err);
+      }
+    }
+  };
+
+  form.addEventListener('submit', (evt) => evt.preventDefault());
+  // Every keystroke goes out right away: the server answers a lone request immediately and
+  // coalesces a fast burst, so only the newest value of the burst is computed.
+  form.addEventListener('input', update);
+}
+
+async function refreshTableIfChanged() {
+  const container = document.getElementById('table-container');
+  const card = container && container.querySelector('[data-report-etag]');
+  if (!card) {
+    return;
+  }
+
+  try {
+    const response = await fetch('/partials/table', {
+      cache: 'no-store',
+      headers: {'If-None-Match': card.dataset.reportEtag}
+    });
+    // 304: the table on screen is still current, keep it (and the DataTable state) as is.
+    if (response.status !== 200) {
+      return;
+    }
+    container.innerHTML = await response.text();
+    initDataTable();
+  } catch (err) {
+    console.error('Table refresh failed:', err);
+  }
+}
+
+document.addEventListener('visibilitychange', function () {
+  if (document.visibilityState === 'visible') {
+    refreshTableIfChanged();
+  }
+});
+document.addEventListener('DOMContentLoaded', initCalculator);
 document.addEventListener('DOMContentLoaded', initDataTable);
 document.addEventListener('DOMContentLoaded', initAmountChartFromPayload);
 document.body.addEventListener('htmx:afterSwap', function (evt) {
@@ -181,4 +360,7 @@ document.body.addEventListener('htmx:afterSwap', function (evt) {
   if (evt.target.id === 'stats-container') {
     initAmountChartFromPayload();
   }
+  if (evt.target.id === 'stats-history-container') {
+    initHistoryChartFromPayload();
+  }
 });
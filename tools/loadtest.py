@@ -0,0 +1,407 @@
+"""
+Offline load test for the web app.
+
+Starts a stub of the lend_request API and the app (uvicorn subprocess) on localhost,
+drives a weighted mix of index/calc/load-api/stats traffic at fixed concurrency and
+reports throughput, p50/p95/p99 latency and error rate per endpoint.
+
+Example:
+    python tools/loadtest.py --items 5000 --api-latency-ms 30 --concurrency 16 --duration 30 \
+        --max-p95-ms 800 --max-error-rate 0.01
+
+Exit code is 1 when an SLO threshold is violated, so the run can gate a release.
+"""
+
+import argparse
+import gzip
+import hashlib
+import http.client
+import json
+import math
+import os
+from pathlib import Path
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+
+PERIODS = [7, 10, 14, 20, 30, 40, 45, 60, 90]
+STATUSES = ["active", "active", "active", "closed", "canceled"]
+DEFAULT_MIX = "index=30,calc=50,load-api=10,stats=10"
+ERROR_MARKER = "Ошибка"
+
+
+def build_dataset(size: int, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    items = []
+    for item_id in range(1, size + 1):
+        amount = rng.choice([50, 100, 150, 200, 250, 300, 500, 700, 1000, 1500, 2000]) + rng.choice([0, 0, 0, 0.5, 25])
+        period_days = rng.choice(PERIODS)
+        interest_rate = rng.choice([365, 500, 600, 700, 730])
+        items.append(
+            {
+                "id": item_id,
+                "amount": f"{amount:.2f}",
+                "period_days": period_days,
+                "interest_rate": interest_rate,
+                "request_type": "lend",
+                "status": rng.choice(STATUSES),
+                "created_at": "2024-01-01T00:00:00Z",
+                "rating": rng.randint(10, 90),
+                "loans_count": rng.randint(0, 40),
+                "period_type": "days",
+                "percent_amount": round(amount * interest_rate / 100 * period_days / 365, 2),
+            }
+        )
+    return items
+
+
+class StubApi:
+    """Paginated lend_request stub with pagination meta, page size cap, ETag and gzip support."""
+
+    def __init__(self, items: List[dict], latency_sec: float, max_page_size: int):
+        self.items = items
+        self.latency_sec = latency_sec
+        self.max_page_size = max_page_size
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/api/internal/v1/public/loans/lend_request/"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="stub-api", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                page = max(1, int(query.get("page", ["1"])[0]))
+                page_size = min(stub.max_page_size, max(1, int(query.get("page_size", ["100"])[0])))
+                status = query.get("status", [None])[0]
+                items = stub.items if status is None else [item for item in stub.items if item["status"] == status]
+                page_items = items[(page - 1) * page_size : page * page_size]
+                body = json.dumps(
+                    {
+                        "data": page_items,
+                        "pagination": {
+                            "count": len(items),
+                            "total_pages": max(1, math.ceil(len(items) / page_size)),
+                        },
+                    }
+                ).encode("utf-8")
+                if stub.latency_sec:
+                    time.sleep(stub.latency_sec)
+
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port: int, data_dir: Path, app_workers: int) -> subprocess.Popen:
+    env = dict(os.environ, KAPUSTA_DATA_DIR=str(data_dir))
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(app_workers),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, cwd=str(REPO_DIR), env=env)
+
+
+def wait_until_ready(port: int, timeout_sec: float) -> float:
+    started = time.perf_counter()
+    deadline = started + timeout_sec
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"App did not start on port {port} within {timeout_sec}s")
+
+
+def parse_mix(raw: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def _form(fields: Dict[str, str]) -> Tuple[str, Dict[str, str]]:
+    return urlencode(fields), {"Content-Type": "application/x-www-form-urlencoded", "HX-Request": "true"}
+
+
+def request_index(rng: random.Random, api_url: str):
+    return "GET", "/", None, {}
+
+
+def request_calc(rng: random.Random, api_url: str):
+    body, headers = _form(
+        {
+            "calc_amount": str(rng.choice([100, 250, 500, 700, 1000]) + rng.randint(0, 9)),
+            "calc_rate": str(rng.choice([365, 500, 700])),
+            "calc_period": str(rng.choice(PERIODS)),
+        }
+    )
+    return "POST", "/actions/calc", body, headers
+
+
+def request_load_api(rng: random.Random, api_url: str):
+    body, headers = _form(
+        {
+            "api_base_url": api_url,
+            "amount_min": "",
+            "amount_max": "",
+            "period_days_min": "",
+            "period_days_max": "",
+            "rating_min": "",
+            "rating_max": "",
+        }
+    )
+    return "POST", "/actions/load-api", body, headers
+
+
+def request_stats(rng: random.Random, api_url: str):
+    body, headers = _form(
+        {
+            "min_amount_count": rng.choice(["", "", "2", "5"]),
+            "max_amount_count": "",
+            "min_rating": rng.choice(["", "30", "45", "60"]),
+        }
+    )
+    return "POST", "/actions/stats", body, headers
+
+
+ENDPOINTS = {
+    "index": request_index,
+    "calc": request_calc,
+    "load-api": request_load_api,
+    "stats": request_stats,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[Tuple[float, bool]]] = {}
+
+    def add(self, endpoint: str, latency_sec: float, ok: bool):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((latency_sec, ok))
+
+
+def run_worker(
+    port: int,
+    api_url: str,
+    mix: List[Tuple[str, float]],
+    deadline: float,
+    recorder: Recorder,
+    seed: int,
+    request_timeout_sec: float,
+):
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    conn: Optional[http.client.HTTPConnection] = None
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(names, weights)[0]
+        method, path, body, headers = ENDPOINTS[endpoint](rng, api_url)
+        started = time.perf_counter()
+        ok = False
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=request_timeout_sec)
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            payload = resp.read()
+            ok = resp.status < 400 and ERROR_MARKER.encode("utf-8") not in payload
+        except (OSError, http.client.HTTPException):
+            if conn is not None:
+                conn.close()
+            conn = None
+        recorder.add(endpoint, time.perf_counter() - started, ok)
+    if conn is not None:
+        conn.close()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: Recorder, elapsed_sec: float) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    all_samples = []
+    for endpoint, samples in sorted(recorder.samples.items()):
+        all_samples.extend(samples)
+        summary[endpoint] = _summarize_samples(samples, elapsed_sec)
+    summary["total"] = _summarize_samples(all_samples, elapsed_sec)
+    return summary
+
+
+def _summarize_samples(samples: List[Tuple[float, bool]], elapsed_sec: float) -> Dict[str, float]:
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    count = len(samples)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": errors / count if count else 0.0,
+        "rps": count / elapsed_sec if elapsed_sec else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_report(summary: Dict[str, Dict[str, float]], startup_sec: float):
+    print(f"App ready in {startup_sec * 1000:.0f} ms")
+    header = f"{'endpoint':<10} {'requests':>9} {'rps':>8} {'err%':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in summary.items():
+        print(
+            f"{endpoint:<10} {row['requests']:>9} {row['rps']:>8.1f} {row['error_rate'] * 100:>6.2f}% "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+        )
+
+
+def check_slo(summary: Dict[str, Dict[str, float]], max_p95_ms: Optional[float], max_error_rate: Optional[float]) -> List[str]:
+    violations = []
+    for endpoint, row in summary.items():
+        if max_p95_ms is not None and row["p95_ms"] > max_p95_ms:
+            violations.append(f"{endpoint}: p95 {row['p95_ms']:.1f} ms > {max_p95_ms} ms")
+        if max_error_rate is not None and row["error_rate"] > max_error_rate:
+            violations.append(f"{endpoint}: error rate {row['error_rate']:.4f} > {max_error_rate}")
+    return violations
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Offline load test for the Kapusta web app.")
+    parser.add_argument("--items", type=int, default=2000, help="stub dataset size")
+    parser.add_argument("--api-latency-ms", type=float, default=20.0, help="stub latency per page request")
+    parser.add_argument("--api-max-page-size", type=int, default=250, help="largest page_size the stub serves")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="test duration in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights, default: {DEFAULT_MIX}")
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--request-timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="SLO: max p95 latency per endpoint")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="SLO: max error rate per endpoint")
+    parser.add_argument("--json", dest="json_path", default=None, help="write the summary as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    stub = StubApi(build_dataset(args.items, args.seed), args.api_latency_ms / 1000.0, args.api_max_page_size)
+    stub.start()
+
+    with tempfile.TemporaryDirectory(prefix="kapusta-loadtest-") as data_dir:
+        (Path(data_dir) / "kapusta_report_settings.json").write_text(
+            json.dumps({"api_base_url": stub.base_url}), encoding="utf-8"
+        )
+        port = free_port()
+        app_proc = start_app(port, Path(data_dir), args.app_workers)
+        try:
+            startup_sec = wait_until_ready(port, timeout_sec=60)
+            recorder = Recorder()
+            started = time.perf_counter()
+            deadline = started + args.duration
+            workers = [
+                threading.Thread(
+                    target=run_worker,
+                    args=(port, stub.base_url, mix, deadline, recorder, args.seed + index, args.request_timeout),
+                    daemon=True,
+                )
+                for index in range(args.concurrency)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            app_proc.terminate()
+            try:
+                app_proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                app_proc.kill()
+            stub.stop()
+
+    summary = summarize(recorder, elapsed)
+    print_report(summary, startup_sec)
+    if args.json_path:
+        Path(args.json_path).write_text(
+            json.dumps({"startup_ms": startup_sec * 1000, "endpoints": summary}, indent=2), encoding="utf-8"
+        )
+
+    violations = check_slo(summary, args.max_p95_ms, args.max_error_rate)
+    for violation in violations:
+        print(f"SLO violated: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())